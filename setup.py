@@ -7,6 +7,7 @@ with open('./requirements.txt') as f:
 setup(name='tensoraerospace',
         version='0.2.1',
         install_requires=required,
+        extras_require={'fast': ['numba>=0.53']},
         packages=[package for package in find_packages() if package.startswith("tensoraerospace")],
         python_requires=">=3.7",
         author_email="mr8bit@yandex.ru",
@@ -1,4 +1,3 @@
-import matplotlib.pyplot as plt
 import numpy as np
 
 from .utils.constant import state_to_latex_rus, state_to_latex_eng, \
@@ -147,6 +146,8 @@ class ModelBase:
         >>> plot = model.plot_by_state('alpha', time, to_deg=True, figsize=(5,4))
 
         """
+        import matplotlib.pyplot as plt
+
         state_hist = self.get_state(state_name, to_deg, to_rad)
         if lang == 'rus':
             label = state_to_latex_rus[state_name]
@@ -190,6 +191,8 @@ class ModelBase:
         >>> plot = model.plot_error('alpha', time, ref_signal, to_deg=True, figsize=(5,4))
 
         """
+        import matplotlib.pyplot as plt
+
         state_hist = self.get_state(state_name, to_deg, to_rad)
         error = ref_signal[:self.time_step - 1] - state_hist[:self.time_step - 1]
         if lang == 'rus':
@@ -231,6 +234,8 @@ class ModelBase:
         >>> plot = model.plot_transient_process('alpha', time, ref_signal, to_deg=True, figsize=(5,4))
 
         """
+        import matplotlib.pyplot as plt
+
         state_hist = self.get_state(state_name, to_deg, to_rad)
         if lang == 'rus':
             label = state_to_latex_rus[state_name]
@@ -274,6 +279,8 @@ class ModelBase:
 
         >>> plot = model.plot_by_control('stab', time, to_deg=True, figsize=(15,4))
         """
+        import matplotlib.pyplot as plt
+
         state_hist = self.get_control(control_name, to_deg, to_rad)
         if lang == 'rus':
             label = control_to_latex_rus[control_name]
@@ -1,4 +1,3 @@
-import matplotlib.pyplot as plt
 import numpy as np
 from scipy.signal import cont2discrete
 
@@ -237,6 +236,8 @@ class ELVRocket(ModelBase):
 
     def plot_output(self, output_name: str, time: np.ndarray, lang: str = 'rus', to_deg: bool = False,
                     to_rad: bool = False, figsize: tuple = (10, 10)):
+        import matplotlib.pyplot as plt
+
         if to_rad and to_deg:
             raise Exception(f"Неверно указано форматирование, укажите один. to_rad или to_deg.")
         if output_name not in self.list_state:
@@ -1,7 +1,6 @@
 import os
 import json
 import numpy as np
-import matplotlib.pyplot as plt
 
 from scipy.io import loadmat
 from scipy.signal import *
@@ -1,5 +1,3 @@
-import matlab
-
 theta = [0]
 alpha = [0]
 q = [0]
@@ -35,4 +33,6 @@ def set_initial_state(new_initial: dict):
 
     for key, value in new_initial.items():
         initial_state_dict[key] = [value]
+    import matlab
+
     return matlab.double(list(initial_state_dict.values()))
@@ -5,8 +5,7 @@ import numpy as np
 from tensoraerospace.aerospacemodel.f16.nonlinear.utils import output2dict
 from scipy.signal import *
 from tensoraerospace.aerospacemodel.base import ModelBase
-from tensoraerospace.aerospacemodel.utils import state_to_latex_rus, state_to_latex_eng
-import matplotlib.pyplot as plt
+from tensoraerospace.aerospacemodel.utils.constant import state_to_latex_rus, state_to_latex_eng
 
 
 class DirectionalSuperSonic(ModelBase):
@@ -147,21 +146,19 @@ class DirectionalSuperSonic(ModelBase):
         :param ut: input to the system
         :return: xt1 --> the next time step state
         """
+        ut_0 = np.ravel(ut_0)
         if self.time_step != 0:
             ut_1 = self.store_input[:, self.time_step - 1]
         else:
             ut_1 = ut_0
-        ut = [0, ]
+        ut = np.empty(self.number_inputs)
         for i in range(self.number_inputs):
-            ut[i] = max(min(max(min(ut_0[i],
-                                    np.reshape(
-                                        np.array([ut_1[i] + self.input_rate_limits[i] * self.discretisation_time]),
-                                        [-1, 1])),
-                                np.reshape(np.array([ut_1[i] - self.input_rate_limits[i] * self.discretisation_time]),
-                                           [-1, 1])),
-                            np.array([[self.input_magnitude_limits[i]]])),
-                        - np.array([[self.input_magnitude_limits[i]]]))
-        ut = np.array(ut)
+            p = float(ut_1[i])
+            rate_dt = self.input_rate_limits[i] * self.discretisation_time
+            u = min(float(ut_0[i]), p + rate_dt)
+            u = max(u, p - rate_dt)
+            u = min(u, self.input_magnitude_limits[i])
+            ut[i] = max(u, -self.input_magnitude_limits[i])
         self.xt1 = np.matmul(self.filt_A, np.reshape(self.xt, [-1, 1])) + np.matmul(self.filt_B,
                                                                                     np.reshape(ut, [-1, 1]))
         output = np.matmul(self.filt_C, np.reshape(self.xt, [-1, 1]))
@@ -252,6 +249,8 @@ class DirectionalSuperSonic(ModelBase):
 
     def plot_output(self, output_name: str, time: np.ndarray, lang: str = 'rus', to_deg: bool = False,
                     to_rad: bool = False, figsize: tuple = (10, 10)):
+        import matplotlib.pyplot as plt
+
         if output_name == 'wz':
             output_name = 'q'
         if output_name == 'wx':
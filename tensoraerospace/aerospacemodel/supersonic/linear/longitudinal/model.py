@@ -1,11 +1,144 @@
-import matplotlib.pyplot as plt
+import functools
+
 import numpy as np
-from scipy.signal import *
+from scipy.signal import cont2discrete
 
 from tensoraerospace.aerospacemodel.base import ModelBase
-from tensoraerospace.aerospacemodel.utils import state_to_latex_rus, state_to_latex_eng
+from tensoraerospace.aerospacemodel.utils.constant import state_to_latex_rus, state_to_latex_eng
 from tensoraerospace.aerospacemodel.f16.nonlinear.utils import output2dict
 
+# numba is optional (pip install tensoraerospace[fast]), without it the NumPy path is used
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# Linearised continuous-time matrices of the system obtained from Matlab, shared read-only by all instances
+_A_CONT = np.array([
+    [-0.0110, 0.0433, 1.7295, -7.1876],
+    [-0.0691, -0.6975, -7.0678, -54.8916],
+    [0.00011, 0.00116, -0.35407, 0.0911],
+    [0, 0, 1, 0],
+])
+
+_B_CONT = np.array([
+    [-0.4412],
+    [-12.388],
+    [-0.58446],
+    [0]
+])
+
+_C_CONT = np.array([
+    [0, 0, 1, 0],
+    [0, 0, 0, 1],
+    [-0.00298, 0.01218, 0, 1],
+    [0.9715, 0.2372, 0, 0],
+    [-0.0687, -0.6975, -7.128, -53.405],
+    [-0.0647, -0.7485, 8.287, -57.37],
+    [0.00298, -0.01218, 0, 0],
+])
+
+_D_CONT = np.array([
+    [0],
+    [0],
+    [0],
+    [0],
+    [-12.42],
+    [-12.87],
+    [0],
+])
+
+for _matrix in (_A_CONT, _B_CONT, _C_CONT, _D_CONT):
+    _matrix.setflags(write=False)
+
+_kernels_compiled = False
+
+if njit is not None:
+    @njit(cache=True, fastmath={'contract'})
+    def _step_kernel(filt_A, filt_B, filt_C, filt_D, xt, ut_prev, ut_cmd, mag_lim, rate_lim, dt,
+                     ut_out, xt1_out, output_out):
+        """
+        One discrete time step: rate/magnitude limiter followed by the state and output matvecs
+        :return: ut_out, xt1_out and output_out are filled in place
+        """
+        n_states = xt.shape[0]
+        n_inputs = ut_cmd.shape[0]
+        n_outputs = output_out.shape[0]
+        for j in range(n_inputs):
+            u = min(ut_cmd[j], ut_prev[j] + rate_lim[j] * dt)
+            u = max(u, ut_prev[j] - rate_lim[j] * dt)
+            u = min(u, mag_lim[j])
+            ut_out[j] = max(u, -mag_lim[j])
+        for i in range(n_states):
+            acc = 0.0
+            for k in range(n_states):
+                acc += filt_A[i, k] * xt[k]
+            for j in range(n_inputs):
+                acc += filt_B[i, j] * ut_out[j]
+            xt1_out[i] = acc
+        for i in range(n_outputs):
+            acc = 0.0
+            for k in range(n_states):
+                acc += filt_C[i, k] * xt[k]
+            for j in range(n_inputs):
+                acc += filt_D[i, j] * ut_out[j]
+            output_out[i] = acc
+
+    @functools.lru_cache(maxsize=8)
+    def _make_runner(n_states: int, n_outputs: int, n_inputs: int):
+        """
+        Builds the trajectory loop specialised on the system sizes, they are compile-time constants of the closure
+        :param n_states: the number of states
+        :param n_outputs: the number of outputs
+        :param n_inputs: the number of inputs
+        :return: numba function filling the histories in place for ut_series starting from the time step t0
+        """
+        @njit(cache=True, fastmath={'contract'})
+        def run_trajectory(filt_A, filt_B, filt_C, filt_D, ut_series, mag_lim, rate_lim, dt,
+                           store_states, store_input, store_outputs, t0):
+            # The state is carried in local buffers so the matvecs never read the history being written
+            xt = np.empty(n_states)
+            xt1 = np.empty(n_states)
+            ut_prev = np.empty(n_inputs)
+            ut = np.empty(n_inputs)
+            for k in range(n_states):
+                xt[k] = store_states[t0, k]
+            if t0 > 0:
+                for j in range(n_inputs):
+                    ut_prev[j] = store_input[t0 - 1, j]
+            elif ut_series.shape[1] > 0:
+                for j in range(n_inputs):
+                    ut_prev[j] = ut_series[j, 0]
+            for n in range(ut_series.shape[1]):
+                t = t0 + n
+                for j in range(n_inputs):
+                    u = min(ut_series[j, n], ut_prev[j] + rate_lim[j] * dt)
+                    u = max(u, ut_prev[j] - rate_lim[j] * dt)
+                    u = min(u, mag_lim[j])
+                    u = max(u, -mag_lim[j])
+                    ut[j] = u
+                    ut_prev[j] = u
+                    store_input[t, j] = u
+                for i in range(n_outputs):
+                    acc = filt_C[i, 0] * xt[0]
+                    for k in range(1, n_states):
+                        acc += filt_C[i, k] * xt[k]
+                    for j in range(n_inputs):
+                        acc += filt_D[i, j] * ut[j]
+                    store_outputs[t, i] = acc
+                for i in range(n_states):
+                    acc = filt_A[i, 0] * xt[0]
+                    for k in range(1, n_states):
+                        acc += filt_A[i, k] * xt[k]
+                    for j in range(n_inputs):
+                        acc += filt_B[i, j] * ut[j]
+                    xt1[i] = acc
+                for k in range(n_states):
+                    xt[k] = xt1[k]
+                    store_states[t + 1, k] = xt1[k]
+
+        return run_trajectory
+
 
 class LongitudinalSuperSonic(ModelBase):
     """
@@ -29,8 +162,23 @@ class LongitudinalSuperSonic(ModelBase):
         * $\alpha_{zcg}$ - нормальное ускорение в CG (центре масс) [м/с^2]
         * $\alpha_{zp}$ - нормальное ускорение на станции пилота [м/с^2]
         * $\gamma$ - Угол траектории полета [град]
+
+    История моделирования (время по первой оси, в отличие от других моделей aerospacemodel,
+    где массивы имеют вид (каналы, шаги)):
+        * store_states - состояния, (number_time_steps + 1, 4); история $q$ - store_states[:, 2]
+        * store_input - управление, (number_time_steps, 1)
+        * store_outputs - выходы, (number_time_steps, 7)
     """
 
+    # Discretised (A, B, C, D) shared by all instances, keyed by the class and the discretisation time
+    _discretization_cache = {}
+
+    # Aliases and row indices of the states and inputs for the accessors
+    _STATE_ALIAS = {'wz': 'q', 'wx': 'p', 'wy': 'r'}
+    _STATE_INDEX = {'u': 0, 'w': 1, 'q': 2, 'theta': 3}
+    _INPUT_ALIAS = {'stab': 'ele', 'dir': 'rud'}
+    _INPUT_INDEX = {'ele': 0}
+
     def __init__(self, x0, number_time_steps, selected_state_output=None, t0=0, dt: float = 0.01):
         super().__init__(x0, selected_state_output, t0, dt)
         self.discretisation_time = dt
@@ -56,7 +204,8 @@ class LongitudinalSuperSonic(ModelBase):
         self.number_inputs = len(self.selected_input)
         self.number_outputs = len(self.selected_output)
         self.number_states = len(self.selected_states)
-        self.output_history = []
+        # Output dict for the accessors, filled lazily by get_output
+        self.output_history = {}
         # Original matrices of the system
         self.A = None
         self.B = None
@@ -69,6 +218,10 @@ class LongitudinalSuperSonic(ModelBase):
         self.filt_C = None
         self.filt_D = None
 
+        # Batch of trajectories, see initialise_batch
+        self.number_trajectories = 0
+        self.xt_batch = None
+
         self.initialise_system(x0, number_time_steps)
 
     def import_linear_system(self):
@@ -76,39 +229,10 @@ class LongitudinalSuperSonic(ModelBase):
         Retrieves the stored linearised matrices obtained from Matlab
         :return:
         """
-        self.A = np.array([
-            [-0.0110, 0.0433, 1.7295, -7.1876],
-            [-0.0691, -0.6975, -7.0678, -54.8916],
-            [0.00011, 0.00116, -0.35407, 0.0911],
-            [0, 0, 1, 0],
-        ])
-
-        self.B = np.array([
-            [-0.4412],
-            [-12.388],
-            [-0.58446],
-            [0]
-        ])
-
-        self.C = np.array([
-            [0, 0, 1, 0],
-            [0, 0, 0, 1],
-            [-0.00298, 0.01218, 0, 1],
-            [0.9715, 0.2372, 0, 0],
-            [-0.0687, -0.6975, -7.128, -53.405],
-            [-0.0647, -0.7485, 8.287, -57.37],
-            [0.00298, -0.01218, 0, 0],
-        ])
-
-        self.D = np.array([
-            [0],
-            [0],
-            [0],
-            [0],
-            [-12.42],
-            [-12.87],
-            [0],
-        ])
+        self.A = _A_CONT
+        self.B = _B_CONT
+        self.C = _C_CONT
+        self.D = _D_CONT
 
     def initialise_system(self, x0, number_time_steps):
         """
@@ -124,18 +248,60 @@ class LongitudinalSuperSonic(ModelBase):
         self.number_time_steps = number_time_steps
         self.time_step = 0
 
-        # Discretise the system according to the discretisation time
-        (self.filt_A, self.filt_B, self.filt_C, self.filt_D, _) = cont2discrete((self.A, self.B, self.C,
-                                                                                 self.D),
-                                                                                self.discretisation_time)
-
-        self.store_states = np.zeros((self.number_states, self.number_time_steps + 1))
-        self.store_input = np.zeros((self.number_inputs, self.number_time_steps))
-        self.store_outputs = np.zeros((self.number_outputs, self.number_time_steps))
+        # Discretise the system according to the discretisation time, the result is reused between instances
+        key = (type(self), round(self.discretisation_time, 12))
+        cached = LongitudinalSuperSonic._discretization_cache.get(key)
+        if cached is None:
+            cached = cont2discrete((self.A, self.B, self.C, self.D), self.discretisation_time)[:4]
+            LongitudinalSuperSonic._discretization_cache[key] = cached
+        self.filt_A, self.filt_B, self.filt_C, self.filt_D = (m.copy() for m in cached)
+        # Contiguous float64 copies for the per-step matvecs
+        self.filt_A = np.ascontiguousarray(self.filt_A, dtype=np.float64)
+        self.filt_C = np.ascontiguousarray(self.filt_C, dtype=np.float64)
+        self.filt_B = np.ascontiguousarray(self.filt_B, dtype=np.float64)
+        self.filt_D = np.ascontiguousarray(self.filt_D, dtype=np.float64)
+        # [A | B] and [C | D] act on the stacked vector z = [x; u], one matvec each per step
+        self._AB = np.ascontiguousarray(np.hstack([self.filt_A, self.filt_B]))
+        self._CD = np.ascontiguousarray(np.hstack([self.filt_C, self.filt_D]))
+        # Input limits used by every simulation path, re-read from the lists on each initialise_system
+        self.mag_lim = np.array(self.input_magnitude_limits, dtype=np.float64)
+        self.rate_lim = np.array(self.input_rate_limits, dtype=np.float64)
+
+        # Histories are stored time-major so every step writes one contiguous row
+        self.store_states = np.zeros((self.number_time_steps + 1, self.number_states))
+        self.store_input = np.zeros((self.number_time_steps, self.number_inputs))
+        self.store_outputs = np.zeros((self.number_time_steps, self.number_outputs))
+        self._output_dict_dirty = True
+
+        self._ut_buf = np.empty(self.number_inputs)
+        self._z = np.empty(self.number_states + self.number_inputs)
+        self.xt1 = np.empty(self.number_states)
+        self._out_buf = np.empty(self.number_outputs)
 
         self.x0 = x0
-        self.xt = x0
-        self.store_states[:, self.time_step] = np.reshape(self.xt, [-1, ])
+        self.xt = np.array(x0, dtype=np.float64).reshape(-1)
+        self.store_states[self.time_step] = self.xt
+        if njit is not None:
+            self._compile_kernels()
+
+    def _compile_kernels(self):
+        """
+        Compiles the numba kernels once per process so the first simulation step does not pay for it
+        :return:
+        """
+        global _kernels_compiled
+        if _kernels_compiled:
+            return
+        ut = np.zeros(self.number_inputs)
+        _step_kernel(self.filt_A, self.filt_B, self.filt_C, self.filt_D, self.xt.copy(), ut, ut,
+                     self.mag_lim, self.rate_lim, self.discretisation_time,
+                     np.empty(self.number_inputs), np.empty(self.number_states), np.empty(self.number_outputs))
+        run_trajectory = _make_runner(self.number_states, self.number_outputs, self.number_inputs)
+        run_trajectory(self.filt_A, self.filt_B, self.filt_C, self.filt_D, np.zeros((self.number_inputs, 1)),
+                       self.mag_lim, self.rate_lim, self.discretisation_time,
+                       np.zeros((2, self.number_states)), np.zeros((1, self.number_inputs)),
+                       np.zeros((1, self.number_outputs)), 0)
+        _kernels_compiled = True
 
     def run_step(self, ut_0: np.ndarray):
         """
@@ -143,40 +309,135 @@ class LongitudinalSuperSonic(ModelBase):
         :param ut: input to the system
         :return: xt1 --> the next time step state
         """
+        if njit is not None:
+            return self._run_step_numba(ut_0)
+        ut_0 = np.ravel(ut_0)
         if self.time_step != 0:
-            ut_1 = self.store_input[:, self.time_step - 1]
+            ut_1 = self.store_input[self.time_step - 1]
         else:
             ut_1 = ut_0
-        ut = [0, ]
+        ut = self._ut_buf
         for i in range(self.number_inputs):
-            ut[i] = max(min(max(min(ut_0[i],
-                                    np.reshape(
-                                        np.array([ut_1[i] + self.input_rate_limits[i] * self.discretisation_time]),
-                                        [-1, 1])),
-                                np.reshape(np.array([ut_1[i] - self.input_rate_limits[i] * self.discretisation_time]),
-                                           [-1, 1])),
-                            np.array([[self.input_magnitude_limits[i]]])),
-                        - np.array([[self.input_magnitude_limits[i]]]))
-        ut = np.array(ut)
-        self.xt1 = np.matmul(self.filt_A, np.reshape(self.xt, [-1, 1])) + np.matmul(self.filt_B,
-                                                                                    np.reshape(ut, [-1, 1]))
-        output = np.matmul(self.filt_C, np.reshape(self.xt, [-1, 1])) + np.matmul(self.filt_D, np.reshape(ut, [-1, 1]))
-
-        self.store_input[:, self.time_step] = np.reshape(ut, [ut.shape[0]])
-        self.store_outputs[:, self.time_step] = np.reshape(output, [output.shape[0]])
-        self.store_states[:, self.time_step + 1] = np.reshape(self.xt1, [self.xt1.shape[0]])
+            p = float(ut_1[i])
+            rate_dt = self.rate_lim[i] * self.discretisation_time
+            u = min(float(ut_0[i]), p + rate_dt)
+            u = max(u, p - rate_dt)
+            u = min(u, self.mag_lim[i])
+            ut[i] = max(u, -self.mag_lim[i])
+        self._z[:self.number_states] = self.xt
+        self._z[self.number_states:] = ut
+        np.dot(self._AB, self._z, out=self.xt1)
+        np.dot(self._CD, self._z, out=self._out_buf)
+
+        self.store_input[self.time_step] = ut
+        self.store_outputs[self.time_step] = self._out_buf
+        self.store_states[self.time_step + 1] = self.xt1
+
+        self.update_system_attributes()
+        if self.selected_state_output:
+            return self.xt1[self.selected_state_index].reshape(-1, 1)
+        return self.xt1.reshape(-1, 1).copy()
+
+    def _run_step_numba(self, ut_0: np.ndarray):
+        """
+        run_step through the compiled kernel
+        :param ut_0: input to the system
+        :return: xt1 --> the next time step state
+        """
+        ut_cmd = np.asarray(ut_0, dtype=np.float64).reshape(-1)
+        ut_1 = self.store_input[self.time_step - 1] if self.time_step != 0 else ut_cmd
+        _step_kernel(self.filt_A, self.filt_B, self.filt_C, self.filt_D, self.xt, ut_1, ut_cmd,
+                     self.mag_lim, self.rate_lim, self.discretisation_time, self._ut_buf, self.xt1, self._out_buf)
+
+        self.store_input[self.time_step] = self._ut_buf
+        self.store_outputs[self.time_step] = self._out_buf
+        self.store_states[self.time_step + 1] = self.xt1
 
         self.update_system_attributes()
         if self.selected_state_output:
-            return np.array(self.xt1[self.selected_state_index])
-        return np.array(self.xt1)
+            return self.xt1[self.selected_state_index].reshape(-1, 1)
+        return self.xt1.reshape(-1, 1).copy()
+
+    def run_many_steps(self, ut_series: np.ndarray):
+        """
+        Runs several time steps at once, the whole loop is compiled with numba when it is installed
+        :param ut_series: inputs to the system, shape (number_inputs, number of steps)
+        :return: the states after every step, shape (number_states, number of steps)
+        """
+        ut_series = np.ascontiguousarray(ut_series, dtype=np.float64).reshape(self.number_inputs, -1)
+        start = self.time_step
+        stop = start + ut_series.shape[1]
+        if stop > self.number_time_steps:
+            raise Exception(f"Превышено количество шагов моделирования {self.number_time_steps}")
+        if start == stop:
+            return np.empty((self.number_states, 0))
+        if njit is None:
+            for n in range(ut_series.shape[1]):
+                self.run_step(ut_series[:, n])
+        else:
+            run_trajectory = _make_runner(self.number_states, self.number_outputs, self.number_inputs)
+            run_trajectory(self.filt_A, self.filt_B, self.filt_C, self.filt_D, ut_series,
+                           self.mag_lim, self.rate_lim, self.discretisation_time,
+                           self.store_states, self.store_input, self.store_outputs, start)
+            self.xt1[:] = self.store_states[stop]
+            self.xt[:] = self.xt1
+            self.time_step = stop
+        return self.store_states[start + 1:stop + 1].T.copy()
+
+    def initialise_batch(self, number_trajectories: int, x0=None):
+        """
+        Initialises a batch of trajectories that share the discretised system
+        :param number_trajectories: the number of trajectories N simulated in parallel
+        :param x0: the initial states, shape (number_states,) or (number_states, N); self.x0 by default
+        :return:
+        """
+        if x0 is None:
+            x0 = self.x0
+        x0 = np.array(x0, dtype=np.float64)
+        if x0.size == self.number_states:
+            x0 = np.tile(x0.reshape(-1, 1), (1, number_trajectories))
+        self.number_trajectories = number_trajectories
+        self.batch_time_step = 0
+        self.xt_batch = np.ascontiguousarray(x0.reshape(self.number_states, number_trajectories))
+
+        self.store_states_batch = np.zeros((self.number_time_steps + 1, self.number_states, number_trajectories))
+        self.store_input_batch = np.zeros((self.number_time_steps, self.number_inputs, number_trajectories))
+        self.store_outputs_batch = np.zeros((self.number_time_steps, self.number_outputs, number_trajectories))
+        self.store_states_batch[0] = self.xt_batch
+
+    def run_step_batch(self, ut_cmd: np.ndarray):
+        """
+        Runs one time step for every trajectory of the batch with a single matmul per matrix
+        :param ut_cmd: inputs to the system, shape (number_inputs, N)
+        :return: the next time step states, shape (number_states, N)
+        """
+        ut_cmd = np.asarray(ut_cmd, dtype=np.float64).reshape(self.number_inputs, self.number_trajectories)
+        if self.batch_time_step != 0:
+            ut_prev = self.store_input_batch[self.batch_time_step - 1]
+        else:
+            ut_prev = ut_cmd
+        rate_dt = self.rate_lim.reshape(-1, 1) * self.discretisation_time
+        mag = self.mag_lim.reshape(-1, 1)
+        ut = np.clip(np.clip(ut_cmd, ut_prev - rate_dt, ut_prev + rate_dt), -mag, mag)
+
+        xt1 = self.filt_A @ self.xt_batch + self.filt_B @ ut
+        output = self.filt_C @ self.xt_batch + self.filt_D @ ut
+
+        self.store_input_batch[self.batch_time_step] = ut
+        self.store_outputs_batch[self.batch_time_step] = output
+        self.store_states_batch[self.batch_time_step + 1] = xt1
+
+        self.xt_batch = xt1
+        self.batch_time_step += 1
+        return xt1.copy()
 
     def update_system_attributes(self):
         """
         The attributes that change with every time step are updated
         :return:
         """
-        self.xt = self.xt1
+        # Copy into the persistent state buffer, xt1 is overwritten in place on the next step
+        self.xt[:] = self.xt1
         self.time_step += 1
 
     def get_state(self, state_name: str, to_deg: bool = False, to_rad: bool = False):
@@ -196,20 +457,16 @@ class LongitudinalSuperSonic(ModelBase):
         >>> state_hist = model.get_state('alpha', to_deg=True)
 
         """
-        if state_name == 'wz':
-            state_name = 'q'
-        if state_name == 'wx':
-            state_name = 'p'
-        if state_name == 'wy':
-            state_name = 'r'
-        if state_name not in self.selected_states:
+        state_name = self._STATE_ALIAS.get(state_name, state_name)
+        index = self._STATE_INDEX.get(state_name)
+        if index is None:
             raise Exception(f"{state_name} нет в списке состояний, доступные {self.selected_states}")
-        index = self.selected_states.index(state_name)
+        state = self.store_states[:self.number_time_steps - 1, index]
         if to_deg:
-            return np.rad2deg(self.store_states[index][:self.number_time_steps - 1])
+            return np.rad2deg(state)
         if to_rad:
-            return np.deg2rad(self.store_states[index][:self.number_time_steps - 1])
-        return self.store_states[index][:self.number_time_steps - 1]
+            return np.deg2rad(state)
+        return state
 
     def get_control(self, control_name: str, to_deg: bool = False, to_rad: bool = False):
         """
@@ -218,6 +475,7 @@ class LongitudinalSuperSonic(ModelBase):
         Args:
             control_name: Название сигнала управления
             to_deg: Конвертировать в градусы
+            to_rad: Конвертировать в радианы
 
         Returns:
             Массив истории выбранного сигнала управления
@@ -226,38 +484,56 @@ class LongitudinalSuperSonic(ModelBase):
 
         >>> state_hist = model.get_control('stab', to_deg=True)
         """
-        if control_name in ['stab', 'ele']:
-            control_name = 'ele'
-        if control_name in ['rud', 'dir']:
-            control_name = 'rud'
-        if control_name not in self.selected_input or control_name not in ["ele", "ail", "rud"]:
+        control_name = self._INPUT_ALIAS.get(control_name, control_name)
+        index = self._INPUT_INDEX.get(control_name)
+        if index is None:
             raise Exception(f"{control_name} нет в списке сигналов управления, доступные {self.selected_input}")
-        index = self.selected_input.index(control_name)
+        control = self.store_input[:self.number_time_steps - 1, index]
         if to_deg:
-            return np.rad2deg(self.store_input[index])[:self.number_time_steps - 1]
+            return np.rad2deg(control)
         if to_rad:
-            return np.deg2rad(self.store_states[index][:self.number_time_steps - 1])
-        return self.store_input[index][:self.number_time_steps - 1]
+            return np.deg2rad(control)
+        return control
 
     def get_output(self, state_name: str, to_deg: bool = False, to_rad: bool = False):
-        self.output_history = output2dict(self.store_outputs, self.selected_output)
+        """
+        Получить массив выхода
+
+        Args:
+            state_name: Название выхода
+            to_deg: Конвертировать в градусы
+            to_rad: Конвертировать в радианы
+
+        Returns:
+            Массив истории выбранного выхода
+
+        Пример:
+
+        >>> output_hist = model.get_output('alpha', to_deg=True)
+        """
+        # The dict holds views of store_outputs, so it is rebuilt only when the history array is reallocated
+        if self._output_dict_dirty:
+            self.output_history = output2dict(self.store_outputs.T, self.selected_output)
+            self._output_dict_dirty = False
+        output = self.output_history[state_name][:self.time_step - 1]
         if to_deg:
-            return np.rad2deg(self.state_history[state_name][:self.time_step - 1])
+            return np.rad2deg(output)
         if to_rad:
-            return np.deg2rad(self.state_history[state_name][:self.time_step - 1])
-        return self.output_history[state_name][:self.time_step - 1]
+            return np.deg2rad(output)
+        return output
 
     def plot_output(self, output_name: str, time: np.ndarray, lang: str = 'rus', to_deg: bool = False,
                     to_rad: bool = False, figsize: tuple = (10, 10)):
+        import matplotlib.pyplot as plt
+
         if to_rad and to_deg:
             raise Exception(f"Неверно указано форматирование, укажите один. to_rad или to_deg.")
-        if output_name not in self.list_state:
-            raise Exception(f"{output_name} нет в списке сигналов управления")
-        if not self.control_history:
-            self.control_history = output2dict(self.store_outputs, self.selected_output)
+        if output_name not in self.selected_output:
+            raise Exception(f"{output_name} нет в списке выходов, доступные {self.selected_output}")
         state_hist = self.get_output(output_name, to_deg, to_rad)
         if output_name == 'u':
-            state_hist *= 1.94384
+            # get_output may return a view of the history, scale a copy
+            state_hist = state_hist * 1.94384
         if lang == 'rus':
             label = state_to_latex_rus[output_name]
             label_time = 't, c'
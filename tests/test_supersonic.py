@@ -0,0 +1,161 @@
+import numpy as np
+import pytest
+from scipy.signal import cont2discrete
+
+from tensoraerospace.aerospacemodel.supersonic.linear.longitudinal import LongitudinalSuperSonic
+from tensoraerospace.aerospacemodel.supersonic.linear.longitudinal import model as model_module
+from tensoraerospace.aerospacemodel.supersonic.linear.longitudinal.output_based import \
+    LongitudinalSuperSonic as OutputBasedSuperSonic
+from tensoraerospace.aerospacemodel.supersonic.linear.directional import DirectionalSuperSonic
+
+
+X0 = [[1.0], [0.5], [0.01], [0.02]]
+
+
+@pytest.fixture
+def model():
+    return LongitudinalSuperSonic(X0, number_time_steps=100)
+
+
+def test_run_step_matches_state_space(model):
+    A, B, C, D, _ = cont2discrete((model.A, model.B, model.C, model.D), model.discretisation_time)
+    x = np.array(X0)
+    for _ in range(10):
+        # Малый сигнал, чтобы не сработали ограничения по скорости и величине
+        u = np.array([[0.1]])
+        y = C @ x + D @ u
+        x = A @ x + B @ u
+        xt1 = model.run_step(u)
+        assert xt1.shape == (4, 1)
+        assert xt1 == pytest.approx(x)
+    assert model.store_outputs[9] == pytest.approx(y.ravel())
+
+
+def test_run_step_returns_copy(model):
+    # Возвращаемое состояние не должно меняться на следующих шагах
+    xt1 = model.run_step(np.array([[0.1]]))
+    saved = xt1.copy()
+    model.run_step(np.array([[0.2]]))
+    assert np.array_equal(xt1, saved)
+
+
+def test_run_many_steps_matches_run_step(model):
+    # Сигнал с большими скачками, чтобы сработали оба ограничения
+    ut_series = np.deg2rad(np.linspace(-40, 40, 50)).reshape(1, -1) * 30
+    reference = LongitudinalSuperSonic(X0, number_time_steps=100)
+    expected = np.hstack([reference.run_step(ut_series[:, [n]]) for n in range(ut_series.shape[1])])
+
+    states = model.run_many_steps(ut_series)
+    assert states.shape == (4, 50)
+    assert states == pytest.approx(expected)
+    assert model.time_step == reference.time_step
+    assert model.store_input == pytest.approx(reference.store_input)
+    assert model.store_outputs == pytest.approx(reference.store_outputs)
+
+
+def test_run_many_steps_without_numba(model, monkeypatch):
+    monkeypatch.setattr(model_module, 'njit', None)
+    reference = LongitudinalSuperSonic(X0, number_time_steps=100)
+    ut_series = np.full((1, 20), 0.5)
+    states = model.run_many_steps(ut_series)
+    for n in range(20):
+        assert states[:, [n]] == pytest.approx(reference.run_step(ut_series[:, [n]]))
+
+
+def test_run_many_steps_out_of_range(model):
+    with pytest.raises(Exception):
+        model.run_many_steps(np.zeros((1, 101)))
+
+
+def test_run_step_batch_matches_run_step(model):
+    number_trajectories = 3
+    rng = np.random.default_rng(0)
+    ut_batch = rng.uniform(-1, 1, (30, 1, number_trajectories))
+    model.initialise_batch(number_trajectories)
+    states = np.stack([model.run_step_batch(ut) for ut in ut_batch], axis=-1)
+    assert states.shape == (4, number_trajectories, 30)
+    for n in range(number_trajectories):
+        single = LongitudinalSuperSonic(X0, number_time_steps=100)
+        for k in range(30):
+            assert states[:, [n], k] == pytest.approx(single.run_step(ut_batch[k, :, [n]]))
+        assert model.store_outputs_batch[:30, :, n] == pytest.approx(single.store_outputs[:30])
+
+
+def test_discretization_cache_is_not_shared_by_reference(model):
+    other = LongitudinalSuperSonic(X0, number_time_steps=100)
+    assert other.filt_A == pytest.approx(model.filt_A)
+    other.filt_A[0, 0] += 1.0
+    assert LongitudinalSuperSonic(X0, number_time_steps=100).filt_A == pytest.approx(model.filt_A)
+
+
+def test_get_control_to_rad_uses_input_history(model):
+    for _ in range(5):
+        model.run_step(np.array([[0.1]]))
+    assert model.get_control('ele', to_rad=True) == pytest.approx(np.deg2rad(model.store_input[:99, 0]))
+    assert model.get_control('stab', to_deg=True) == pytest.approx(np.rad2deg(model.store_input[:99, 0]))
+
+
+def test_get_output_follows_new_steps(model):
+    for _ in range(5):
+        model.run_step(np.array([[0.1]]))
+    assert model.get_output('a_zcg') == pytest.approx(model.store_outputs[:4, 4])
+    model.run_many_steps(np.full((1, 5), 0.2))
+    assert model.get_output('a_zcg', to_deg=True) == pytest.approx(np.rad2deg(model.store_outputs[:9, 4]))
+
+
+def test_accessor_aliases(model):
+    model.run_step(np.array([[0.1]]))
+    assert np.array_equal(model.get_state('wz'), model.get_state('q'))
+    assert np.array_equal(model.get_control('stab'), model.get_control('ele'))
+    with pytest.raises(Exception):
+        model.get_state('wx')
+    with pytest.raises(Exception):
+        model.get_control('rud')
+
+
+def test_plot_output_keeps_history(model):
+    pytest.importorskip('matplotlib')
+    for _ in range(5):
+        model.run_step(np.array([[0.1]]))
+    saved = model.store_outputs.copy()
+    time = np.arange(100) * model.discretisation_time
+    model.plot_output('u', time)
+    model.plot_output('alpha', time, to_deg=True)
+    assert np.array_equal(model.store_outputs, saved)
+
+
+def test_run_many_steps_empty_series(model):
+    states = model.run_many_steps(np.zeros((1, 0)))
+    assert states.shape == (4, 0)
+    assert model.time_step == 0
+    assert np.array_equal(model.store_states[0], np.array(X0).ravel())
+
+
+
+@pytest.mark.parametrize('use_numba', [True, False])
+def test_limits_are_reread_by_initialise_system(model, monkeypatch, use_numba):
+    if not use_numba:
+        monkeypatch.setattr(model_module, 'njit', None)
+    model.input_magnitude_limits = [0.05, ]
+    model.initialise_system(X0, 100)
+    model.run_step(np.array([[0.5]]))
+    model.run_many_steps(np.array([[-0.5]]))
+    assert model.store_input[:2, 0] == pytest.approx([0.05, -0.05])
+
+
+def test_output_based_limiter():
+    model = OutputBasedSuperSonic(X0, number_time_steps=100)
+    for u in [30.0, 0.0, 0.0, 24.0]:
+        model.run_step(np.array([[u]]))
+    # Сначала ограничение по величине (25), затем по скорости (60 * 0.01 за шаг)
+    assert model.store_input[0, :4] == pytest.approx([25.0, 24.4, 23.8, 24.0])
+
+
+def test_directional_limiter_two_inputs():
+    model = DirectionalSuperSonic([[0.0]] * 5, number_time_steps=100)
+    for ut in [[30.0, -30.0], [0.0, 0.0], [0.0, 0.0]]:
+        xt1 = model.run_step(np.array(ut).reshape(-1, 1))
+    assert xt1.shape == (5, 1)
+    # Ограничения элеронов 25 и 60 * 0.01, руля направления 21.5 и 90 * 0.01
+    assert model.store_input[0, :3] == pytest.approx([25.0, 24.4, 23.8])
+    assert model.store_input[1, :3] == pytest.approx([-21.5, -20.6, -19.7])